@@ -1,8 +1,17 @@
 # ------------------- Imports ------------------- #
+import os
+from collections import OrderedDict
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objs as go
+import plotly.io as pio
+
+
+# ------------------- Plot Styling ------------------- #
+# Resolved once and shared by every chart
+PLOT_TEMPLATE = pio.templates['plotly_white']
+PLOT_LAYOUT = dict(xaxis_title='Year', yaxis_title='MW', template=PLOT_TEMPLATE, margin=dict(l=40, r=20, t=60, b=40))
 
 
 
@@ -14,167 +23,210 @@ RUEN_PATH = 'RUEN_rtu.csv'
 # ------------------- Setup and Data Loading ------------------- #
 def setup_ui():
     st.title("Solar PV Target: A Glimpse into RUEN & RUPTL Plans")
-    st.markdown("Dive into interactive visuals that spotlight the Solar PV targets set out by the RUEN and RUPTL policies. Use the main visualization to get a broad overview, and tweak your view with sidebar customization tools. Curious about the specifics? Access the untouched data through the “raw data” button in the sidebar. Any dashboard access issues? Don’t hesitate to drop me an email at taufik.impact@gmail.com")
+    st.markdown("Dive into interactive visuals that spotlight the Solar PV targets set out by the RUEN and RUPTL policies. Use the main visualization to get a broad overview, and tweak your view with the customization options above each chart. Curious about the specifics? Access the untouched data through the “raw data” button below each chart. Any dashboard access issues? Don’t hesitate to drop me an email at taufik.impact@gmail.com")
     
-    st.sidebar.title("Sidebar Options")
-    st.sidebar.markdown("Navigate through to select a specific year of interest, analyze the cumulative target, or group and compare regions of your choice")
-    st.sidebar.header("Customization Options")
     st.subheader("RUEN")
-    st.markdown("**RUEN**, short for *Rencana Umum Energi Nasional*, translates to the **National Energy General Plan**. According to *IESR's 2020 report*, RUEN is instrumental in molding Indonesia's national strategic blueprint, emphasizing the electricity and energy sectors. It lays the groundwork for spawning derivative or sub-policies within Indonesia's energy realm. This significant policy arose from the **Presidential Regulation of Indonesia No. 22** in 2017. Below, you'll delve into two visualization strategies: The **independent target** for each distinct year and The **cumulative target** spanning multiple years.  Visuals are split into: **(a) National Target** - An aggregate of provincial objectives. **(b) Provincial Breakdown from RUEN** - A chart sourced directly from RUEN, spotlighting targets specific to each province. Utilize the sidebar to switch between years, with data spanning from 2015 to 2025, for an all-encompassing look at Indonesia's energy goals over the decade.")
+    st.markdown("**RUEN**, short for *Rencana Umum Energi Nasional*, translates to the **National Energy General Plan**. According to *IESR's 2020 report*, RUEN is instrumental in molding Indonesia's national strategic blueprint, emphasizing the electricity and energy sectors. It lays the groundwork for spawning derivative or sub-policies within Indonesia's energy realm. This significant policy arose from the **Presidential Regulation of Indonesia No. 22** in 2017. Below, you'll delve into two visualization strategies: The **independent target** for each distinct year and The **cumulative target** spanning multiple years.  Visuals are split into: **(a) National Target** - An aggregate of provincial objectives. **(b) Provincial Breakdown from RUEN** - A chart sourced directly from RUEN, spotlighting targets specific to each province. Utilize the customization options to switch between years, with data spanning from 2015 to 2025, for an all-encompassing look at Indonesia's energy goals over the decade.")
+
+
+
+# Modification time of a dataset, used as a cheap cache key so edited files are reloaded
+def file_mtime(filepath):
+    return os.path.getmtime(filepath) if os.path.exists(filepath) else None
 
 
+# Bump when the sidecar's dtypes change so copies written by older builds are ignored
+PARQUET_VERSION = 2
 
-def load_data(filepath):
+
+# Parsed once per file version and reused across reruns
+@st.cache_data(show_spinner=False)
+def load_data(filepath, mtime):
     try:
-        df = pd.read_csv(filepath)
-        df.columns = [str(col) if isinstance(col, int) else col for col in df.columns]
+        # Reuse the Parquet sidecar unless the CSV has been edited since it was written
+        parquet_path = f'{filepath}.v{PARQUET_VERSION}.parquet'
+        df = None
+        if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(filepath):
+            try:
+                df = pd.read_parquet(parquet_path)
+            except (OSError, ValueError):
+                df = None
+
+        if df is None:
+            # Multi-threaded Arrow parser; pyarrow is already required for the sidecar
+            df = pd.read_csv(filepath, engine='pyarrow')
+            df.columns = [str(col) if isinstance(col, int) else col for col in df.columns]
+
+            # Store the label column as categorical, keeping the categories in file order
+            df[df.columns[0]] = df[df.columns[0]].astype(pd.CategoricalDtype(df[df.columns[0]].unique()))
+
+            # Write to a temporary file first so an interrupted write never leaves a truncated sidecar
+            tmp_path = parquet_path + '.tmp'
+            try:
+                df.to_parquet(tmp_path)
+                os.replace(tmp_path, parquet_path)
+            except OSError:
+                pass
+
         return df, df.columns[1:].tolist()
     except FileNotFoundError:
         st.error(f"Error: The dataset file {filepath} was not found.")
         st.stop()
 
-# ------------------- Sidebar Options ------------------- #
+# ------------------- Options ------------------- #
 
 def select_indonesia_options(years):
-    st.sidebar.subheader("RUEN (National) Filtering")
-    
     # Default values for start and end year
     default_start_year = '2015'
     default_end_year = '2025'
 
     # Select year range for the national visualization with default values
-    start_year_indonesia = st.sidebar.selectbox("Start Year (National)", options=years, index=years.index(default_start_year))
-    end_year_indonesia = st.sidebar.selectbox("End Year (National)", options=years, index=years.index(default_end_year))
+    start_year_indonesia = st.selectbox("Start Year (National)", options=years, index=years.index(default_start_year))
+    end_year_indonesia = st.selectbox("End Year (National)", options=years, index=years.index(default_end_year))
 
     # Warning if the end year precedes the start year
     if start_year_indonesia >= end_year_indonesia:
-        st.sidebar.warning("Start year should precede end year.")
+        st.warning("Start year should precede end year.")
         st.stop()
 
     # Default to Scatterplot visualization
-    viz_type = st.sidebar.selectbox("Visualization Style (National)", options=['Scatterplot', 'Bar Chart'], index=0)
+    viz_type = st.selectbox("Visualization Style (National)", options=['Scatterplot', 'Bar Chart'], index=0)
     return start_year_indonesia, end_year_indonesia, viz_type
 
 
 def select_province_options(years, df):
-    st.sidebar.subheader("RUEN (Provincial) Filtering")
-    
     # Select year range for the provincial visualization
-    years_range = st.sidebar.slider("Year Range (Provincial)", min_value=int(years[0]), max_value=int(years[-1]), value=[int(years[0]), int(years[-1])])
+    years_range = st.slider("Year Range (Provincial)", min_value=int(years[0]), max_value=int(years[-1]), value=[int(years[0]), int(years[-1])])
     
-    # Select specific provinces to visualize
-    selected_provinces = st.sidebar.multiselect("Provinces", df['Province'].unique().tolist(), default=df['Province'].unique().tolist())
+    # Select specific provinces to visualize, keeping only their category codes in widget state
+    provinces = df['Province'].cat.categories
+    selected_provinces = st.multiselect("Provinces", range(len(provinces)), format_func=lambda i: provinces[i], default=list(range(len(provinces))))
     return years_range, selected_provinces
 
 
+# ------------------- Figure Cache ------------------- #
+FIGURE_CACHE_SIZE = 16
+
+# Per-session cache of built figures, keyed by dataset mtime and widget selections, evicting the least recently used
+def cached_figure(key, build):
+    figures = st.session_state.setdefault('figures', OrderedDict())
+    if key in figures:
+        figures.move_to_end(key)
+        return figures[key]
+
+    figure = build()
+    figures[key] = figure
+    if len(figures) > FIGURE_CACHE_SIZE:
+        figures.popitem(last=False)
+    return figure
+
+
 # ------------------- Data Plotting ------------------- #
 
+# Yearly and cumulative national totals, computed once per file version and keyed on (filepath, mtime);
+# the leading underscore keeps Streamlit from hashing the frame itself
+@st.cache_data(show_spinner=False)
+def compute_national_totals(_df, filepath, mtime):
+    yearly_total = _df.iloc[:, 1:].sum().to_frame()
+    yearly_total.columns = ['Target']
+    return yearly_total, yearly_total.cumsum()
+
 # Plotting the data for Indonesia
-def plot_indonesia(df, start_year, end_year, viz_type):
+def plot_indonesia(df, mtime, start_year, end_year, viz_type):
     st.subheader('(a) National Target (MW)')
-    yearly_total = df.iloc[:, 1:].sum().to_frame()
-    yearly_total.columns = ['Target']
-    
-    # Calculate the cumulative totals
-    cumulative_total = yearly_total.cumsum()
+    yearly_total, cumulative_total = compute_national_totals(df, RUEN_PATH, mtime)
 
     # Filter based on year selection
     yearly_total_filtered = yearly_total.loc[start_year:end_year]
     cumulative_total_filtered = cumulative_total.loc[start_year:end_year]
 
-    if viz_type == 'Scatterplot':
-        fig_independent = go.Figure(go.Scatter(x=yearly_total_filtered.index, y=yearly_total_filtered['Target'], mode='lines+markers', name='Target'))
-        fig_cumulative = go.Figure(go.Scatter(x=cumulative_total_filtered.index, y=cumulative_total_filtered['Target'], mode='lines+markers', name='Cumulative Target'))
-    else:
-        fig_independent = go.Figure(go.Bar(x=yearly_total_filtered.index, y=yearly_total_filtered['Target'], name='Target'))
-        fig_cumulative = go.Figure(go.Bar(x=cumulative_total_filtered.index, y=cumulative_total_filtered['Target'], name='Cumulative Target'))
+    fig_independent, fig_cumulative = cached_figure(
+        ('ruen_nat', mtime, start_year, end_year, viz_type),
+        lambda: build_indonesia_figures(yearly_total_filtered, cumulative_total_filtered, start_year, end_year, viz_type))
 
-    fig_independent.update_layout(title=f'Independent Yearly Progression for National Target ({start_year}-{end_year}) in MW')
     st.plotly_chart(fig_independent)
     st.markdown("*The Independent Yearly Progression represents the specific targets set for each year, showcasing how the targets change annually.*")
     
-    fig_cumulative.update_layout(title=f'Cumulative Progression for National Target ({start_year}-{end_year}) in MW')
     st.plotly_chart(fig_cumulative)
     st.markdown("*The Cumulative Progression illustrates the total targets accumulated over the selected range of years, highlighting the compounding effect of yearly targets.*")
 
-    if st.sidebar.button('Show Raw Data for National Target'):
+    if st.button('Show Raw Data for National Target'):
         st.subheader("Raw Data in MW")
-        summed_data = df.drop(columns="Province").sum().to_frame().transpose()
-        st.write(summed_data.loc[:, start_year:end_year])
+        st.write(yearly_total_filtered['Target'].to_frame('Total').T)
+
+
+def build_indonesia_figures(yearly_total_filtered, cumulative_total_filtered, start_year, end_year, viz_type):
+    if viz_type == 'Scatterplot':
+        fig_independent = go.Figure(go.Scattergl(x=yearly_total_filtered.index, y=yearly_total_filtered['Target'], mode='lines+markers', name='Target'))
+        fig_cumulative = go.Figure(go.Scattergl(x=cumulative_total_filtered.index, y=cumulative_total_filtered['Target'], mode='lines+markers', name='Cumulative Target'))
+    else:
+        fig_independent = go.Figure(go.Bar(x=yearly_total_filtered.index, y=yearly_total_filtered['Target'], name='Target'))
+        fig_cumulative = go.Figure(go.Bar(x=cumulative_total_filtered.index, y=cumulative_total_filtered['Target'], name='Cumulative Target'))
+
+    fig_independent.update_layout(title=f'Independent Yearly Progression for National Target ({start_year}-{end_year}) in MW', **PLOT_LAYOUT)
+    fig_cumulative.update_layout(title=f'Cumulative Progression for National Target ({start_year}-{end_year}) in MW', **PLOT_LAYOUT)
+    return fig_independent, fig_cumulative
 
 
 
-def plot_province(df, years_range, selected_provinces):
+def plot_province(df, mtime, years_range, selected_provinces):
     st.subheader('(b) Province (MW)')
-    df_filtered = df[df['Province'].isin(selected_provinces)]
+
+    # Skip the filter entirely when every province is selected, otherwise match on category codes
+    if len(selected_provinces) == len(df['Province'].cat.categories):
+        df_filtered = df
+    else:
+        df_filtered = df.loc[df['Province'].cat.codes.isin(selected_provinces)]
     
-    independent_fig = px.bar(df_filtered, x='Province', y=str(years_range[1]), title=f"Independent Totals for {years_range[1]} by Province")
-    st.plotly_chart(independent_fig)
+    independent_fig, cumulative_fig = cached_figure(
+        ('ruen_prov', mtime, tuple(years_range), tuple(selected_provinces)),
+        lambda: build_province_figures(df_filtered, years_range))
 
-    cumulative_fig = px.bar(df_filtered, x='Province', y=df_filtered.columns[-1], title=f"Cumulative Totals from {years_range[0]} to {years_range[1]} by Province")
+    st.plotly_chart(independent_fig)
     st.plotly_chart(cumulative_fig)
 
-    if st.sidebar.button('Show Raw Data for Provinces'):
+    if st.button('Show Raw Data for Provinces'):
         st.write(df_filtered)
 
-# ------------------- Main Function ------------------- #
-def main():
-    setup_ui()
-    
-    df, years = load_data(RUEN_PATH)
-    
-    start_year_indonesia, end_year_indonesia, viz_type = select_indonesia_options(years)
-    plot_indonesia(df, start_year_indonesia, end_year_indonesia, viz_type)
-
-    years_range, selected_provinces = select_province_options(years, df)
-    plot_province(df, years_range, selected_provinces)
-
-# Entry Point
-if __name__ == "__main__":
-    main()
 
-    
+def build_province_figures(df_filtered, years_range):
+    independent_fig = px.bar(df_filtered, x='Province', y=str(years_range[1]), title=f"Independent Totals for {years_range[1]} by Province", template=PLOT_TEMPLATE)
 
+    cumulative_fig = px.bar(df_filtered, x='Province', y=df_filtered.columns[-1], title=f"Cumulative Totals from {years_range[0]} to {years_range[1]} by Province", template=PLOT_TEMPLATE)
+    return independent_fig, cumulative_fig
 
 # ------------------- RUPTL ------------------- #
 RUPTL_PATH = 'ruptl_trial.csv'
 
-# ------------------- Setup and Data Loading ------------------- #
-def load_data(filepath):
-    try:
-        df = pd.read_csv(filepath)
-        df.columns = [str(col) if isinstance(col, int) else col for col in df.columns]
-        return df, df.columns[1:].tolist()
-    except FileNotFoundError:
-        st.error(f"Error: The dataset file {filepath} was not found.")
-        st.stop()
-
-# ------------------- Sidebar Options ------------------- #
+# ------------------- Options ------------------- #
 def select_options(df, header):
-    st.sidebar.header(header)
-    start_year = st.sidebar.selectbox(f"Select Start Year for {header}", df.columns[1:], index=0)
-    end_year = st.sidebar.selectbox(f"Select End Year for {header}", df.columns[1:], index=len(df.columns[1:])-1)
-    viz_type = st.sidebar.selectbox(f"Visualization Type for {header}", ["Line Graph", "Bar Graph", "Raw Data"])
+    start_year = st.selectbox(f"Select Start Year for {header}", df.columns[1:], index=0)
+    end_year = st.selectbox(f"Select End Year for {header}", df.columns[1:], index=len(df.columns[1:])-1)
+    viz_type = st.selectbox(f"Visualization Type for {header}", ["Line Graph", "Bar Graph", "Raw Data"])
     return start_year, end_year, viz_type
 
 # ------------------- Data Plotting ------------------- #
-def plot_ruptl(df, start_year, end_year, viz_type, title, is_cumulative=False):
+
+# Running totals across all years with gaps counted as zero, computed once per file version
+@st.cache_data(show_spinner=False)
+def compute_running_totals(_df, filepath, mtime):
+    df_cum = _df.copy()
+    df_cum[_df.columns[1:]] = _df[_df.columns[1:]].fillna(0).cumsum(axis=1)
+    return df_cum
+
+def plot_ruptl(df, df_cum, mtime, start_year, end_year, viz_type, title, is_cumulative=False):
     df_subset = df.loc[:, str(start_year):str(end_year)]
     
     if is_cumulative:
-        df_subset = df_subset.cumsum(axis=1)
-    
-    fig = go.Figure()
-
-    for idx, row in df_subset.iterrows():
-        fig.add_trace(go.Scatter(x=row.index, y=row.values, mode='lines+markers', name=df.iloc[idx, 0]))
-        
-    if viz_type == 'Bar Graph':
-        fig = go.Figure()
-        for idx, row in df_subset.iterrows():
-            fig.add_trace(go.Bar(x=row.index, y=row.values, name=df.iloc[idx, 0]))
-
-    fig.update_layout(title=title, xaxis_title='Year', yaxis_title='Values')
+        # Re-base the precomputed running totals so accumulation starts at start_year
+        start_idx = df.columns.get_loc(str(start_year))
+        df_subset = df_cum.loc[:, str(start_year):str(end_year)].where(df_subset.notna())
+        if start_idx > 1:
+            df_subset = df_subset.sub(df_cum.iloc[:, start_idx - 1], axis=0)
+
+    fig = cached_figure(
+        ('ruptl', mtime, title, start_year, end_year, viz_type),
+        lambda: build_ruptl_figure(df, df_subset, viz_type, title))
     st.plotly_chart(fig)
 
     if is_cumulative:
@@ -186,25 +238,67 @@ def plot_ruptl(df, start_year, end_year, viz_type, title, is_cumulative=False):
         st.write(df_subset)
 
 
+def build_ruptl_figure(df, df_subset, viz_type, title):
+    # Long-form frame with one row per (plan, year) so a single px call draws every series
+    label = df.columns[0]
+    df_long = df_subset.assign(**{label: df.iloc[:, 0]}).melt(id_vars=label, var_name='Year', value_name='Value')
+
+    if viz_type == 'Bar Graph':
+        fig = px.bar(df_long, x='Year', y='Value', color=label, barmode='group')
+    else:
+        fig = px.line(df_long, x='Year', y='Value', color=label, markers=True, render_mode='webgl')
+
+    fig.update_layout(title=title, **PLOT_LAYOUT)
+    return fig
+
+
+# ------------------- Sections ------------------- #
+# Each section is a fragment, so changing its options only reruns that section.
+# Fragment reruns replay the arguments from the last full run, so the dataset mtime
+# is passed in alongside the frames rather than re-read, keeping cache keys in step with the data.
+@st.fragment
+def ruen_section(df, mtime, years):
+    with st.expander("RUEN (National) Options", expanded=True):
+        start_year_indonesia, end_year_indonesia, viz_type = select_indonesia_options(years)
+    plot_indonesia(df, mtime, start_year_indonesia, end_year_indonesia, viz_type)
+
+    with st.expander("RUEN (Provincial) Options", expanded=True):
+        years_range, selected_provinces = select_province_options(years, df)
+    plot_province(df, mtime, years_range, selected_provinces)
+
+
+@st.fragment
+def ruptl_section(df, df_cum, mtime):
+    # For Independent target
+    with st.expander("RUPTL: Independent Target Options", expanded=True):
+        start_year_ind, end_year_ind, viz_type_ind = select_options(df, "RUPTL: Independent Target Options")
+    plot_ruptl(df, df_cum, mtime, start_year_ind, end_year_ind, viz_type_ind, "Independent Target for RUPTL")
+       
+    # For Cumulative target
+    with st.expander("RUPTL: Cumulative Target Options", expanded=True):
+        start_year_cum, end_year_cum, viz_type_cum = select_options(df, "RUPTL: Cumulative Target Options")
+    plot_ruptl(df, df_cum, mtime, start_year_cum, end_year_cum, viz_type_cum, "Cumulative Target for RUPTL", is_cumulative=True)
+
+
 # ------------------- Main Function ------------------- #
 def main():
+    setup_ui()
+
+    # RUEN
+    ruen_mtime = file_mtime(RUEN_PATH)
+    df, years = load_data(RUEN_PATH, ruen_mtime)
+    ruen_section(df, ruen_mtime, years)
+
+    # RUPTL
     st.subheader("RUPTL Analysis")
     st.markdown("**RUPTL**, an acronym for **Rencana Umum Penyediaan Tenaga Listrik**, RUPTL translates to the **PLN’s Electricity Supply Business Plan**. This document outlines the projected electricity demands and ongoing projects spearheaded by Perusahaan Listrik Negara. Interestingly, Solar PV wasn't recognized as a promising technology until the 2010-2019 period. During this pivotal decade, solar energy was spotlighted for its: **(a) Bridging Capabilities**: Serving as an alternative to address the gap in the electrification ratio. **(b) Government Support**: Aligning with policies that focus on renewable energy development, which dovetail with the broader goals of environmental conservation and energy diversification. **(c) Community Empowerment**: Providing residents in Indonesia's remote and underdeveloped areas with essential electricity access. **(d) Regional Recognition**: Gaining acknowledgment as a primary energy source, especially in South Sulawesi. In the visualizations that follow, you'll encounter two distinct graphical representations: one illustrating the individual targets set for each RUPTL period and another highlighting the cumulative figures across various years.")
 
-    df_ruptl, ruptl_years = load_data(RUPTL_PATH)
-    
-    # For Independent target
-    start_year_ind, end_year_ind, viz_type_ind = select_options(df_ruptl, "RUPTL: Independent Target Options")
-    plot_ruptl(df_ruptl, start_year_ind, end_year_ind, viz_type_ind, "Independent Target for RUPTL")
-       
-    # For Cumulative target
-    start_year_cum, end_year_cum, viz_type_cum = select_options(df_ruptl, "RUPTL: Cumulative Target Options")
-    plot_ruptl(df_ruptl, start_year_cum, end_year_cum, viz_type_cum, "Cumulative Target for RUPTL", is_cumulative=True)
+    ruptl_mtime = file_mtime(RUPTL_PATH)
+    df_ruptl, _ = load_data(RUPTL_PATH, ruptl_mtime)
+    df_ruptl_cum = compute_running_totals(df_ruptl, RUPTL_PATH, ruptl_mtime)
+    ruptl_section(df_ruptl, df_ruptl_cum, ruptl_mtime)
     
 
 # Entry Point
 if __name__ == "__main__":
     main()
-
-
-    